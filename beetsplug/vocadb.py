@@ -1,10 +1,16 @@
-from collections.abc import Sequence
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from datetime import datetime
-from itertools import chain
-from json import load
+from functools import lru_cache
+from itertools import chain, repeat
+from operator import itemgetter
 from optparse import Values
-from re import Match, match, search
-from typing import NamedTuple, Optional, TypedDict, TYPE_CHECKING, Union
+from os.path import join
+from re import Match, Pattern, compile
+from sqlite3 import Connection, DatabaseError, connect
+from threading import Lock
+from time import time
+from typing import Any, NamedTuple, Optional, TypedDict
 from sys import version_info
 
 if version_info >= (3, 11):
@@ -15,12 +21,11 @@ if version_info >= (3, 12):
     from typing import override
 else:
     from typing_extensions import override
-from urllib.error import HTTPError
-from urllib.parse import quote, urljoin
-from urllib.request import Request, urlopen
-
-if TYPE_CHECKING:
-    from _typeshed import SupportsRead
+try:
+    from orjson import loads
+except ImportError:
+    from json import loads
+from urllib.parse import quote, urlencode
 
 import beets
 from beets import autotag, config, library, ui, util
@@ -29,10 +34,23 @@ from beets.autotag.match import track_distance
 from beets.library import Album, Item, Library
 from beets.plugins import BeetsPlugin, apply_item_changes, get_distance
 from beets.ui import show_model_changes, Subcommand
+from requests import RequestException, Response, Session
+from requests.adapters import HTTPAdapter, Retry
+
+AMAZON_PATTERN: Pattern[str] = compile(r"Amazon( \((LE|RE|JP|US)\).*)?$")
+ASIN_PATTERN: Pattern[str] = compile(r"/dp/(.+?)(/|$)")
+ROLE_KEYS: tuple[tuple[str, str], ...] = (
+    ("Arranger", "arrangers"),
+    ("Composer", "composers"),
+    ("Lyricist", "lyricists"),
+)
+DEFAULT_PRODUCER_ROLES: frozenset[str] = frozenset(role for role, _ in ROLE_KEYS)
 
 
 class InstanceInfo(NamedTuple):
-    """Information about a specific instance of VocaDB"""
+    """Information about a specific instance of VocaDB. The URLs must end
+    with a slash, as paths are appended to them directly.
+    """
 
     name: str
     base_url: str
@@ -40,6 +58,59 @@ class InstanceInfo(NamedTuple):
     subcommand: str
 
 
+class ResponseCache:
+    """Keeps raw API responses in an SQLite database so that later runs don't
+    have to fetch the same albums and tracks again. Entries older than ttl
+    seconds are treated as missing.
+    """
+
+    def __init__(self, path: str, ttl: int) -> None:
+        self.path: str = path
+        self.ttl: int = ttl
+        self.lock: Lock = Lock()
+        self.connection: Optional[Connection] = None
+
+    def get_connection(self) -> Connection:
+        if self.connection is None:
+            self.connection = connect(self.path, check_same_thread=False)
+            with self.connection:
+                self.connection.execute(
+                    "CREATE TABLE IF NOT EXISTS responses"
+                    + " (url TEXT PRIMARY KEY, content BLOB, fetched REAL)"
+                )
+                self.connection.execute(
+                    "DELETE FROM responses WHERE fetched < ?", (time() - self.ttl,)
+                )
+        return self.connection
+
+    def get(self, url: str) -> Optional[bytes]:
+        row: Optional[tuple[bytes]]
+        with self.lock:
+            row = (
+                self.get_connection()
+                .execute(
+                    "SELECT content FROM responses WHERE url = ? AND fetched >= ?",
+                    (url, time() - self.ttl),
+                )
+                .fetchone()
+            )
+        return row[0] if row else None
+
+    def set(self, url: str, content: bytes) -> None:
+        connection: Connection
+        with self.lock, self.get_connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?)",
+                (url, content, time()),
+            )
+
+    def close(self) -> None:
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
+
+
 class APIResultDict(TypedDict):
     id: NotRequired[int]
 
@@ -166,6 +237,7 @@ class ConfigDict(TypedDict):
     include_featured_album_artists: bool
     va_string: str
     max_results: int
+    cache_ttl: int
 
 
 class VocaDBPlugin(BeetsPlugin):
@@ -176,12 +248,18 @@ class VocaDBPlugin(BeetsPlugin):
         "include_featured_album_artists": False,
         "va_string": "Various artists",
         "max_results": 5,
+        "cache_ttl": 604800,
     }
 
     user_agent: str = f"beets/{beets.__version__} +https://beets.io/"
     headers: dict[str, str] = {"accept": "application/json", "User-Agent": user_agent}
     languages: Optional[Sequence[str]] = config["import"]["languages"].as_str_seq()
+    album_fields: str = "Artists,Discs,Tags,Tracks,WebLinks"
     song_fields: str = "Artists,Tags,Bpm,Lyrics"
+    max_workers: int = 8
+    cache_size: int = 128
+    batch_size: int = 32
+    timeout: tuple[float, float] = (5, 15)
 
     instance_info: InstanceInfo = InstanceInfo(
         name="VocaDB",
@@ -200,6 +278,40 @@ class VocaDBPlugin(BeetsPlugin):
         self.config.add(self.default_config)
 
         self.data_source: str = self.instance_info.name
+        # Read once, these are needed for every album and track
+        self.translated_lyrics: bool = bool(self.config["translated_lyrics"].get())
+        self.include_featured_album_artists: bool = bool(
+            self.config["include_featured_album_artists"].get()
+        )
+        self.va_string: str = self.config["va_string"].as_str()
+        self.session: Session = Session()
+        self.session.headers.update(self.headers)
+        adapter: HTTPAdapter = HTTPAdapter(
+            pool_maxsize=self.max_workers,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=(429, 500, 502, 503, 504),
+                raise_on_status=False,
+            ),
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.register_listener("cli_exit", self.session.close)
+        # Failed requests raise and are therefore never cached. The raw body
+        # is cached rather than the parsed info, as beets mutates the latter.
+        self.get_cached_content: Callable[[str], bytes] = lru_cache(
+            maxsize=self.cache_size
+        )(self.get_stored_content)
+        # Album and track responses are also kept on disk between runs
+        cache_ttl: int = self.config["cache_ttl"].get(int)
+        self.response_cache: Optional[ResponseCache] = None
+        if cache_ttl > 0:
+            self.response_cache = ResponseCache(
+                join(config.config_dir(), f"{self.name}_cache.db"), cache_ttl
+            )
+            self.register_listener("cli_exit", self.response_cache.close)
+        self.read_response_cache: bool = True
 
     def __init_subclass__(cls, instance_info: InstanceInfo) -> None:
         super().__init_subclass__()
@@ -227,18 +339,6 @@ class VocaDBPlugin(BeetsPlugin):
     def prefer_romaji(self) -> bool:
         return bool(self.config["prefer_romaji"].get())
 
-    @property
-    def translated_lyrics(self) -> bool:
-        return bool(self.config["translated_lyrics"].get())
-
-    @property
-    def include_featured_album_artists(self) -> bool:
-        return bool(self.config["include_featured_album_artists"].get())
-
-    @property
-    def va_string(self) -> str:
-        return self.config["va_string"].as_str()
-
     @property
     def max_results(self) -> int:
         return self.config["max_results"].as_number()
@@ -277,6 +377,13 @@ class VocaDBPlugin(BeetsPlugin):
             dest="write",
             help="don't write updated metadata to files",
         )
+        cmd.parser.add_option(
+            "--no-cache",
+            action="store_false",
+            default=True,
+            dest="cache",
+            help="ignore cached responses and fetch everything again",
+        )
         cmd.parser.add_format_option()
         cmd.func = self.func
         return tuple([cmd])
@@ -287,23 +394,32 @@ class VocaDBPlugin(BeetsPlugin):
         pretend: bool = opts.pretend
         write: bool = ui.should_write(opts.write)
         query: list[str] = ui.decargs(args)
+        self.read_response_cache = opts.cache
+        # The language can't change during a run, so only resolve it once
+        language: str = self.language
 
-        self.singletons(lib, query, move, pretend, write)
-        self.albums(lib, query, move, pretend, write)
+        self.singletons(lib, query, move, pretend, write, language)
+        self.albums(lib, query, move, pretend, write, language)
 
     def singletons(
-        self, lib: Library, query: list[str], move: bool, pretend: bool, write: bool
+        self,
+        lib: Library,
+        query: list[str],
+        move: bool,
+        pretend: bool,
+        write: bool,
+        language: Optional[str] = None,
     ) -> None:
         """Retrieve and apply info from the autotagger for items matched by
         query.
         """
+        items: list[Item] = []
         item: Item
         for item in lib.items(query + ["singleton:true"]):
-            item_formatted: str = format(item)
             if not item.mb_trackid:
                 self._log.debug(
                     "Skipping singleton with no mb_trackid: {0}",
-                    item_formatted,
+                    item,
                 )
                 continue
             if not (
@@ -313,35 +429,45 @@ class VocaDBPlugin(BeetsPlugin):
                 self._log.debug(
                     "Skipping non-{0} singleton: {1}",
                     self.data_source,
-                    item_formatted,
+                    item,
                 )
                 continue
-            track_info: Optional[TrackInfo] = self.track_for_id(item.mb_trackid)
+            items.append(item)
+        track_infos: Iterator[Optional[TrackInfo]] = self.prefetch(
+            self.track_for_id, [item.mb_trackid for item in items], language
+        )
+        track_info: Optional[TrackInfo]
+        for item, track_info in zip(items, track_infos):
             if not (track_info):
                 self._log.info(
                     "Recording ID not found: {0} for track {1}",
                     item.mb_trackid,
-                    item_formatted,
+                    item,
                 )
                 continue
-            with lib.transaction():
-                autotag.apply_item_metadata(item, track_info)
-                show_model_changes(item)
-                apply_item_changes(lib, item, move, pretend, write)
+            autotag.apply_item_metadata(item, track_info)
+            show_model_changes(item)
+            apply_item_changes(lib, item, move, pretend, write)
 
     def albums(
-        self, lib: Library, query: list[str], move: bool, pretend: bool, write: bool
+        self,
+        lib: Library,
+        query: list[str],
+        move: bool,
+        pretend: bool,
+        write: bool,
+        language: Optional[str] = None,
     ) -> None:
         """Retrieve and apply info from the autotagger for albums matched by
         query and their items.
         """
+        albums: list[Album] = []
         album: Album
         for album in lib.albums(query):
-            album_formatted: str = format(album)
             if not album.mb_albumid:
                 self._log.debug(
                     "Skipping album with no mb_albumid: {0}",
-                    album_formatted,
+                    album,
                 )
                 continue
             if not (
@@ -351,15 +477,20 @@ class VocaDBPlugin(BeetsPlugin):
                 self._log.debug(
                     "Skipping non-{0} album: {1}",
                     self.data_source,
-                    album_formatted,
+                    album,
                 )
                 continue
-            album_info: Optional[AlbumInfo] = self.album_for_id(album.mb_albumid)
+            albums.append(album)
+        album_infos: Iterator[Optional[AlbumInfo]] = self.prefetch(
+            self.album_for_id, [album.mb_albumid for album in albums], language
+        )
+        album_info: Optional[AlbumInfo]
+        for album, album_info in zip(albums, album_infos):
             if not (album_info):
                 self._log.info(
                     "Release ID {0} not found for album {1}",
                     album.mb_albumid,
-                    album_formatted,
+                    album,
                 )
                 continue
             items: Sequence[Item] = list(album.items())
@@ -367,52 +498,56 @@ class VocaDBPlugin(BeetsPlugin):
             track_index: dict[str, TrackInfo] = {
                 str(track.track_id): track for track in album_info.tracks
             }
+            if not track_index:
+                self._log.info(
+                    "Release ID {0} has no tracks for album {1}",
+                    album.mb_albumid,
+                    album,
+                )
+                continue
             mapping: dict[Item, TrackInfo] = {}
             for item in items:
-                if item.mb_trackid not in track_index:
+                track_info: Optional[TrackInfo] = track_index.get(item.mb_trackid)
+                if track_info is None:
                     old_track_id: str = item.mb_trackid
                     # Unset track id so that it won't affect distance
                     item.mb_trackid = None
-                    matches: dict[str, Distance] = {
-                        track_info["track_id"]: track_distance(item, track_info)
-                        for track_info in track_index.values()
-                    }
-                    item.mb_trackid = min(matches, key=lambda k: matches[k])
+                    track_info = min(
+                        track_index.values(),
+                        key=lambda track: track_distance(item, track),
+                    )
+                    item.mb_trackid = track_info.track_id
                     self._log.warning(
                         "Missing track ID {0} in album info for {1} automatched to ID {2}",
                         old_track_id,
-                        album_formatted,
+                        album,
                         item.mb_trackid,
                     )
-                mapping[item] = track_index[item.mb_trackid]
-
-            self._log.debug("applying changes to {}", album_formatted)
-            with lib.transaction():
-                autotag.apply_metadata(album_info, mapping)
-                changed: bool = False
-                any_changed_item: Item = items[0]
-                for item in items:
-                    item_changed: bool = show_model_changes(item)
-                    changed |= item_changed
-                    if item_changed:
-                        any_changed_item = item
-                        apply_item_changes(lib, item, move, pretend, write)
-                if not changed:
-                    continue
-                if not pretend:
-                    key: str
-                    for key in library.Album.item_keys:
-                        if key not in [
-                            "original_day",
-                            "original_month",
-                            "original_year",
-                            "genre",
-                        ]:
-                            album[key] = any_changed_item[key]
-                    album.store()
-                    if move and lib.directory in util.ancestry(items[0].path):
-                        self._log.debug("moving album {0}", album_formatted)
-                        album.move()
+                mapping[item] = track_info
+
+            self._log.debug("applying changes to {}", album)
+            autotag.apply_metadata(album_info, mapping)
+            last_changed_item: Optional[Item] = None
+            for item in items:
+                if show_model_changes(item):
+                    last_changed_item = item
+                    apply_item_changes(lib, item, move, pretend, write)
+            if last_changed_item is None:
+                continue
+            if not pretend:
+                key: str
+                for key in library.Album.item_keys:
+                    if key not in [
+                        "original_day",
+                        "original_month",
+                        "original_year",
+                        "genre",
+                    ]:
+                        album[key] = last_changed_item[key]
+                album.store()
+                if move and lib.directory in util.ancestry(items[0].path):
+                    self._log.debug("moving album {0}", album)
+                    album.move()
 
     @override
     def track_distance(self, item: Item, info: TrackInfo) -> Distance:
@@ -431,6 +566,23 @@ class VocaDBPlugin(BeetsPlugin):
             data_source=self.data_source, info=album_info, config=self.config
         )
 
+    def prefetch(
+        self,
+        lookup: Callable[[str, Optional[str]], Any],
+        ids: Sequence[str],
+        language: Optional[str],
+    ) -> Iterator[Any]:
+        """Looks the ids up on a thread pool and yields the results in order.
+        Ids are fetched one batch at a time as the results are consumed, so
+        memory use doesn't grow with the size of the library.
+        """
+        executor: ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            start: int
+            for start in range(0, len(ids), self.batch_size):
+                end: int = start + self.batch_size
+                yield from executor.map(lookup, ids[start:end], repeat(language))
+
     @override
     def candidates(
         self,
@@ -439,78 +591,83 @@ class VocaDBPlugin(BeetsPlugin):
         album: str,
         va_likely: bool,
         extra_tags: Optional[dict] = None,
-    ) -> tuple[AlbumInfo, ...]:
+    ) -> Iterator[AlbumInfo]:
         self._log.debug("Searching for album {0}", album)
-        url: str = urljoin(
-            self.instance_info.api_url,
-            f"albums/?query={quote(album)}&maxResults={self.max_results}&nameMatchMode=Auto",
+        params: str = urlencode(
+            {
+                "query": album,
+                "maxResults": self.max_results,
+                "nameMatchMode": "Auto",
+            },
+            safe=",",
+            quote_via=quote,
         )
-        request: Request = Request(url, headers=self.headers)
-        result: SupportsRead[Union[str, bytes]]
-        try:
-            with urlopen(request) as result:
-                if result:
-                    result_dict: AlbumFindResultDict = load(result)
-                    self._log.debug(
-                        "Found {0} result(s) for '{1}'",
-                        len(result_dict["items"]),
-                        album,
-                    )
-                    # songFields parameter doesn't exist for album search
-                    # so we'll get albums by their id
-                    ids: list[str] = [
-                        str(item.get("id")) for item in result_dict["items"]
-                    ]
-                    return tuple(
-                        [album for album in map(self.album_for_id, ids) if album]
-                    )
-                else:
-                    self._log.debug("API Error: Returned empty page (query: {0})", url)
-                    return ()
-        except HTTPError as e:
-            self._log.debug("API Error: {0} (query: {1})", e, url)
-            return ()
+        url: str = f"{self.instance_info.api_url}albums/?{params}"
+        result_dict: Optional[AlbumFindResultDict] = self.get_json(url)
+        if not result_dict:
+            return
+        self._log.debug(
+            "Found {0} result(s) for '{1}'",
+            len(result_dict["items"]),
+            album,
+        )
+        # songFields parameter doesn't exist for album search
+        # so we'll get albums by their id
+        ids: list[str] = [str(item.get("id")) for item in result_dict["items"]]
+        language: str = self.language
+        executor: ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures: list[Future[Optional[AlbumInfo]]] = [
+                executor.submit(self.album_for_id, album_id, language)
+                for album_id in ids
+            ]
+            # Hand over each album as soon as it arrives, so beets can score
+            # it while the others are still being fetched
+            future: Future[Optional[AlbumInfo]]
+            for future in as_completed(futures):
+                album_info: Optional[AlbumInfo] = future.result()
+                if album_info:
+                    yield album_info
 
     @override
     def item_candidates(
         self, item: Item, artist: str, title: str
     ) -> tuple[TrackInfo, ...]:
         self._log.debug("Searching for track {0}", item)
-        url: str = urljoin(
-            self.instance_info.api_url,
-            f"songs/?query={quote(title)}"
-            + f"&fields={self.song_fields}"
-            + f"&lang={self.language}"
-            + f"&maxResults={self.max_results}"
-            + "&sort=SongType&preferAccurateMatches=true&nameMatchMode=Auto",
+        language: str = self.language
+        params: str = urlencode(
+            {
+                "query": title,
+                "fields": self.song_fields,
+                "lang": language,
+                "maxResults": self.max_results,
+                "sort": "SongType",
+                "preferAccurateMatches": "true",
+                "nameMatchMode": "Auto",
+            },
+            safe=",",
+            quote_via=quote,
         )
-        request: Request = Request(url, headers=self.headers)
-        result: SupportsRead[Union[str, bytes]]
-        try:
-            with urlopen(request) as result:
-                if result:
-                    result_dict: SongFindResultDict = load(result)
-                    self._log.debug(
-                        "Found {0} result(s) for '{1}'",
-                        len(result_dict["items"]),
-                        title,
-                    )
-                    return tuple(
-                        [
-                            track
-                            for track in map(self.track_info, result_dict["items"])
-                            if track
-                        ]
-                    )
-                else:
-                    self._log.debug("API Error: Returned empty page (query: {0})", url)
-                    return ()
-        except HTTPError as e:
-            self._log.debug("API Error: {0} (query: {1})", e, url)
+        url: str = f"{self.instance_info.api_url}songs/?{params}"
+        result_dict: Optional[SongFindResultDict] = self.get_json(url)
+        if not result_dict:
             return ()
+        self._log.debug(
+            "Found {0} result(s) for '{1}'",
+            len(result_dict["items"]),
+            title,
+        )
+        return tuple(
+            [
+                self.track_info(recording, search_lang=language)
+                for recording in result_dict["items"]
+            ]
+        )
 
     @override
-    def album_for_id(self, album_id: str) -> Optional[AlbumInfo]:
+    def album_for_id(
+        self, album_id: str, language: Optional[str] = None
+    ) -> Optional[AlbumInfo]:
         if not album_id.isnumeric():
             self._log.debug(
                 "Skipping non-{0} album: {1}",
@@ -519,30 +676,27 @@ class VocaDBPlugin(BeetsPlugin):
             )
             return None
         self._log.debug("Searching for album {0}", album_id)
-        language: str = self.language
-        url: str = urljoin(
-            self.instance_info.api_url,
-            f"albums/{album_id}"
-            + "?fields=Artists,Discs,Tags,Tracks,WebLinks"
-            + f"&songFields={self.song_fields}"
-            + f"&lang={language}",
+        if language is None:
+            language = self.language
+        params: str = urlencode(
+            {
+                "fields": self.album_fields,
+                "songFields": self.song_fields,
+                "lang": language,
+            },
+            safe=",",
+            quote_via=quote,
         )
-        request: Request = Request(url, headers=self.headers)
-        result: SupportsRead[Union[str, bytes]]
-        try:
-            with urlopen(request) as result:
-                if result:
-                    result_dict: AlbumDict = load(result)
-                    return self.album_info(result_dict, search_lang=language)
-                else:
-                    self._log.debug("API Error: Returned empty page (query: {0})", url)
-                    return None
-        except HTTPError as e:
-            self._log.debug("API Error: {0} (query: {1})", e, url)
+        url: str = f"{self.instance_info.api_url}albums/{album_id}?{params}"
+        result_dict: Optional[AlbumDict] = self.get_json(url, cache=True)
+        if not result_dict:
             return None
+        return self.album_info(result_dict, search_lang=language)
 
     @override
-    def track_for_id(self, track_id: str) -> Optional[TrackInfo]:
+    def track_for_id(
+        self, track_id: str, language: Optional[str] = None
+    ) -> Optional[TrackInfo]:
         if not track_id.isnumeric():
             self._log.debug(
                 "Skipping non-{0} singleton: {1}",
@@ -551,61 +705,90 @@ class VocaDBPlugin(BeetsPlugin):
             )
             return None
         self._log.debug("Searching for track {0}", track_id)
-        language: str = self.language
-        url: str = urljoin(
-            self.instance_info.api_url,
-            f"songs/{track_id}" + f"?fields={self.song_fields}" + f"&lang={language}",
+        if language is None:
+            language = self.language
+        params: str = urlencode(
+            {"fields": self.song_fields, "lang": language},
+            safe=",",
+            quote_via=quote,
         )
-        request: Request = Request(url, headers=self.headers)
-        result: SupportsRead[Union[str, bytes]]
+        url: str = f"{self.instance_info.api_url}songs/{track_id}?{params}"
+        result_dict: Optional[SongDict] = self.get_json(url, cache=True)
+        if not result_dict:
+            return None
+        return self.track_info(result_dict, search_lang=language)
+
+    def get_json(self, url: str, cache: bool = False) -> Optional[Any]:
+        """Fetches and decodes a JSON document from the API using the
+        plugin's session, so that connections are kept alive between calls.
+        With cache set, the response body is reused for repeated lookups.
+        """
+        content: bytes
         try:
-            with urlopen(request) as result:
-                if result:
-                    result_dict: SongDict = load(result)
-                    return self.track_info(result_dict, search_lang=language)
-                else:
-                    self._log.debug("API Error: Returned empty page (query: {0})", url)
-                    return None
-        except HTTPError as e:
+            content = self.get_cached_content(url) if cache else self.get_content(url)
+        except RequestException as e:
             self._log.debug("API Error: {0} (query: {1})", e, url)
             return None
+        if not content:
+            self._log.debug("API Error: Returned empty page (query: {0})", url)
+            return None
+        return loads(content)
+
+    def get_stored_content(self, url: str) -> bytes:
+        """Returns the response body from the on-disk cache if a fresh copy
+        is stored there, otherwise fetches and stores it.
+        """
+        if self.response_cache is None:
+            return self.get_content(url)
+        content: Optional[bytes] = None
+        if self.read_response_cache:
+            try:
+                content = self.response_cache.get(url)
+            except DatabaseError as e:
+                self._log.debug("Cache Error: {0} (query: {1})", e, url)
+        if content is None:
+            content = self.get_content(url)
+            try:
+                self.response_cache.set(url, content)
+            except DatabaseError as e:
+                self._log.debug("Cache Error: {0} (query: {1})", e, url)
+        return content
+
+    def get_content(self, url: str) -> bytes:
+        response: Response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        return response.content
 
     def album_info(
         self, release: AlbumDict, search_lang: Optional[str] = None
     ) -> AlbumInfo:
-        discs: int = len(
-            set([track["discNumber"] for track in release.get("tracks", [])])
-        )
+        disc_totals: dict[int, int] = {}
+        track: SongInAlbumDict
+        for track in release.get("tracks", []):
+            if track["trackNumber"] > disc_totals.get(track["discNumber"], 0):
+                disc_totals[track["discNumber"]] = track["trackNumber"]
         if not release.get("discs"):
             release["discs"] = [
                 {"discNumber": x + 1, "name": "CD", "mediaType": "Audio"}
-                for x in range(discs)
+                for x in range(len(disc_totals))
             ]
-        ignored_discs: list[int] = []
+        has_tracks: bool = bool(release.get("tracks"))
+        ignore_video_tracks: bool = config["match"]["ignore_video_tracks"].get(bool)
+        ignored_discs: set[int] = set()
         disc: DiscDict
         for disc in release.get("discs", []):
-            if (
-                disc["mediaType"] == "Video"
-                and config["match"]["ignore_video_tracks"]
-                or not release.get("tracks")
-            ):
-                ignored_discs.append(disc["discNumber"])
+            if disc["mediaType"] == "Video" and ignore_video_tracks or not has_tracks:
+                ignored_discs.add(disc["discNumber"])
             else:
-                disc["total"] = max(
-                    [
-                        y
-                        for y in release.get("tracks", {})
-                        if y.get("discNumber") == disc["discNumber"]
-                    ],
-                    key=lambda y: y["trackNumber"],
-                )["trackNumber"]
+                disc["total"] = disc_totals.get(disc["discNumber"], 0)
 
         va: bool = release.get("discType", "") == "Compilation"
         album: str = release.get("name", "")
         album_id: str = str(release.get("id", ""))
         artist_categories: dict[str, dict[str, str]]
         artist: str
-        artist_categories, artist = self.get_artists(
+        label: Optional[str]
+        artist_categories, artist, label = self.get_artists(
             release.get("artists", []),
             self.va_string,
             include_featured_artists=self.include_featured_album_artists,
@@ -613,35 +796,34 @@ class VocaDBPlugin(BeetsPlugin):
         )
         if artist == self.va_string:
             va = True
-        artists: list[str] = []
-        artists_ids: list[str] = []
-        category: dict[str, str]
-        for category in artist_categories.values():
-            artists.extend(
-                [artist for artist in category.keys() if artist not in artists]
-            )
-            artists_ids.extend(
-                [id for id in category.values() if id not in artists_ids]
-            )
+        artists: list[str]
+        artists_ids: list[str]
+        artists, artists_ids = self.get_artists_and_ids(artist_categories)
         artist_id: Optional[str]
         try:
             artist_id = artists_ids[0]
         except IndexError:
             artist_id = None
+        # Tracks keep their position on the whole release as their index
+        indexed_tracks: list[tuple[int, SongInAlbumDict]] = [
+            (index, track)
+            for index, track in enumerate(release["tracks"], 1)
+            if track["discNumber"] not in ignored_discs and "song" in track
+        ]
         tracks: list[TrackInfo]
         script: Optional[str]
         language: Optional[str]
         tracks, script, language = self.get_album_track_infos(
-            release["tracks"], release.get("discs"), ignored_discs, search_lang
+            indexed_tracks, release.get("discs"), search_lang
         )
         weblink: WebLinkDict
         asin_match: Optional[Match[str]] = None
         asin: Optional[str] = None
         for weblink in release.get("webLinks", []):
-            if not weblink["disabled"] and match(
-                "Amazon( \\((LE|RE|JP|US)\\).*)?$", weblink.get("description")
+            if not weblink["disabled"] and AMAZON_PATTERN.match(
+                weblink.get("description")
             ):
-                asin_match = search("\\/dp\\/(.+?)(\\/|$)", weblink.get("url"))
+                asin_match = ASIN_PATTERN.search(weblink.get("url"))
                 if asin_match:
                     asin = asin_match[1]
                     break
@@ -651,12 +833,6 @@ class VocaDBPlugin(BeetsPlugin):
         year: Optional[int] = date.get("year")
         month: Optional[int] = date.get("month")
         day: Optional[int] = date.get("day")
-        label: Optional[str] = None
-        albumartist: AlbumArtistDict
-        for albumartist in release.get("artists", []):
-            if "Label" in albumartist.get("categories", ""):
-                label = albumartist.get("name")
-                break
         mediums: int = len(release["discs"])
         catalognum: Optional[str] = release.get("catalogNumber")
         genre: Optional[str] = self.get_genres(release)
@@ -665,7 +841,7 @@ class VocaDBPlugin(BeetsPlugin):
             media = release["discs"][0].get("name")
         except IndexError:
             media = None
-        data_url: str = urljoin(self.instance_info.base_url, f"Al/{album_id}")
+        data_url: str = f"{self.instance_info.base_url}Al/{album_id}"
         return AlbumInfo(
             album=album,
             album_id=album_id,
@@ -706,29 +882,24 @@ class VocaDBPlugin(BeetsPlugin):
         track_id: str = str(recording.get("id", ""))
         artist_categories: dict[str, dict[str, str]]
         artist: str
-        artist_categories, artist = self.get_artists(
+        artist_categories, artist, _ = self.get_artists(
             recording.get("artists", []), self.va_string
         )
-        category: dict[str, str]
-        artists: list[str] = []
-        artists_ids: list[str] = []
-        for category in artist_categories.values():
-            artists.extend(
-                [artist for artist in category.keys() if artist not in artists]
-            )
-            artists_ids.extend(
-                [id for id in category.values() if id not in artists_ids]
-            )
+        artists: list[str]
+        artists_ids: list[str]
+        artists, artists_ids = self.get_artists_and_ids(artist_categories)
         artist_id: Optional[str]
         try:
             artist_id = artists_ids[0]
         except IndexError:
             artist_id = None
-        arranger: str = ", ".join(artist_categories["arrangers"])
-        composer: str = ", ".join(artist_categories["composers"])
-        lyricist: str = ", ".join(artist_categories["lyricists"])
+        # Producers are credited for any role that has nobody else
+        credits: dict[str, str] = {
+            key: ", ".join(artist_categories[key] or artist_categories["producers"])
+            for _, key in ROLE_KEYS
+        }
         length: float = recording.get("lengthSeconds", 0)
-        data_url: str = urljoin(self.instance_info.base_url, f"S/{track_id}")
+        data_url: str = f"{self.instance_info.base_url}S/{track_id}"
         max_milli_bpm: Optional[int] = recording.get("maxMilliBpm")
         bpm: Optional[str] = str(max_milli_bpm // 1000) if max_milli_bpm else None
         genre: Optional[str] = self.get_genres(recording)
@@ -742,10 +913,9 @@ class VocaDBPlugin(BeetsPlugin):
         original_month: Optional[int] = None
         original_year: Optional[int] = None
         if "publishDate" in recording:
-            date: datetime = datetime.fromisoformat(recording["publishDate"][:-1])
-            original_day = date.day
-            original_month = date.month
-            original_year = date.year
+            original_year, original_month, original_day = self.parse_publish_date(
+                recording["publishDate"]
+            )
         return TrackInfo(
             title=title,
             track_id=track_id,
@@ -762,9 +932,9 @@ class VocaDBPlugin(BeetsPlugin):
             medium_total=medium_total,
             data_source=self.data_source,
             data_url=data_url,
-            lyricist=lyricist,
-            composer=composer,
-            arranger=arranger,
+            lyricist=credits["lyricists"],
+            composer=credits["composers"],
+            arranger=credits["arrangers"],
             bpm=bpm,
             genre=genre,
             script=script,
@@ -777,24 +947,25 @@ class VocaDBPlugin(BeetsPlugin):
 
     def get_album_track_infos(
         self,
-        tracks: list[SongInAlbumDict],
+        tracks: list[tuple[int, SongInAlbumDict]],
         discs: Sequence[DiscDict],
-        ignored_discs: list[int],
         search_lang: Optional[str],
     ) -> tuple[list[TrackInfo], Optional[str], Optional[str]]:
         track_infos: list[TrackInfo] = []
         script: Optional[str] = None
         language: Optional[str] = None
+        discs_by_number: dict[int, DiscDict] = {
+            disc["discNumber"]: disc for disc in discs
+        }
         index: int
         track: SongInAlbumDict
-        for index, track in enumerate(tracks):
-            if track["discNumber"] in ignored_discs or "song" not in track:
-                continue
-            format: Optional[str] = discs[track["discNumber"] - 1].get("name")
-            total: Optional[int] = discs[track["discNumber"] - 1].get("total")
+        for index, track in tracks:
+            disc: Optional[DiscDict] = discs_by_number.get(track["discNumber"])
+            format: Optional[str] = disc.get("name") if disc else None
+            total: Optional[int] = disc.get("total") if disc else None
             track_info: TrackInfo = self.track_info(
                 recording=track["song"],
-                index=index + 1,
+                index=index,
                 media=format,
                 medium=track.get("discNumber", None),
                 medium_index=track.get("trackNumber", None),
@@ -809,7 +980,8 @@ class VocaDBPlugin(BeetsPlugin):
                     script = "Qaaa"
                     language = "mul"
             track_infos.append(track_info)
-        if script == "Qaaa" or language == "mul":
+        # Mixed scripts are only known once every track has been seen
+        if script == "Qaaa":
             for track_info in track_infos:
                 track_info.script = script
                 track_info.language = language
@@ -822,10 +994,13 @@ class VocaDBPlugin(BeetsPlugin):
         va_string: str,
         include_featured_artists: bool = True,
         comp: bool = False,
-    ) -> tuple[dict[str, dict[str, str]], str]:
+    ) -> tuple[dict[str, dict[str, str]], str, Optional[str]]:
         artists_by_categories: dict[str, dict[str, str]]
         is_support: dict[str, bool]
-        artists_by_categories, is_support = cls.get_artists_by_categories(artists)
+        label: Optional[str]
+        artists_by_categories, is_support, label = cls.get_artists_by_categories(
+            artists
+        )
 
         artist_string: Optional[str] = None
         main_artists: Optional[list[str]] = None
@@ -858,12 +1033,29 @@ class VocaDBPlugin(BeetsPlugin):
             if featured_artists and not len(main_artists) + len(featured_artists) > 5:
                 artist_string += " feat. " + ", ".join(featured_artists)
 
-        return artists_by_categories, artist_string
+        return artists_by_categories, artist_string, label
+
+    @staticmethod
+    def get_artists_and_ids(
+        artist_categories: dict[str, dict[str, str]],
+    ) -> tuple[list[str], list[str]]:
+        """Flattens the categories into unique artist names and ids, keeping
+        the order in which they first appear.
+        """
+        artists: dict[str, None] = dict.fromkeys(
+            chain.from_iterable(artist_categories.values())
+        )
+        artists_ids: dict[str, None] = dict.fromkeys(
+            chain.from_iterable(
+                category.values() for category in artist_categories.values()
+            )
+        )
+        return list(artists), list(artists_ids)
 
     @staticmethod
     def get_artists_by_categories(
         artists: list[AlbumArtistDict],
-    ) -> tuple[dict[str, dict[str, str]], dict[str, bool]]:
+    ) -> tuple[dict[str, dict[str, str]], dict[str, bool], Optional[str]]:
         artists_by_categories: dict[str, dict[str, str]] = {
             key: {}
             for key in [
@@ -876,6 +1068,7 @@ class VocaDBPlugin(BeetsPlugin):
             ]
         }
         is_support: dict[str, bool] = {}
+        label: Optional[str] = None
         artist: AlbumArtistDict
         for artist in artists:
             parent: Optional[ArtistDict] = artist.get("artist")
@@ -888,47 +1081,55 @@ class VocaDBPlugin(BeetsPlugin):
                 name = artist.get("name", "")
                 id = ""
             is_support[id] = artist["isSupport"]
-            categories: str = artist["categories"]
-            effectiveRoles: str = artist["effectiveRoles"]
+            categories: frozenset[str] = frozenset(
+                category.strip() for category in artist["categories"].split(",")
+            )
+            roles: frozenset[str] = frozenset(
+                role.strip() for role in artist["effectiveRoles"].split(",")
+            )
             if "Producer" in categories or "Band" in categories:
-                if "Default" in artist["effectiveRoles"]:
-                    artist["effectiveRoles"] += ",Arranger,Composer,Lyricist"
-                    effectiveRoles = artist["effectiveRoles"]
+                if "Default" in roles:
+                    roles |= DEFAULT_PRODUCER_ROLES
                 artists_by_categories["producers"][name] = id
             if "Circle" in categories:
                 artists_by_categories["circles"][name] = id
-            if "Arranger" in effectiveRoles:
-                artists_by_categories["arrangers"][name] = id
-            if "Composer" in effectiveRoles:
-                artists_by_categories["composers"][name] = id
-            if "Lyricist" in effectiveRoles:
-                artists_by_categories["lyricists"][name] = id
             if "Vocalist" in categories:
                 artists_by_categories["vocalists"][name] = id
-        if (
-            not artists_by_categories["producers"]
-            and artists_by_categories["vocalists"]
-        ):
+            if "Label" in categories and label is None:
+                label = artist.get("name")
+            role: str
+            key: str
+            for role, key in ROLE_KEYS:
+                if role in roles:
+                    artists_by_categories[key][name] = id
+        if not artists_by_categories["producers"]:
             artists_by_categories["producers"] = artists_by_categories["vocalists"]
-        if not artists_by_categories["arrangers"]:
-            artists_by_categories["arrangers"] = artists_by_categories["producers"]
-        if not artists_by_categories["composers"]:
-            artists_by_categories["composers"] = artists_by_categories["producers"]
-        if not artists_by_categories["lyricists"]:
-            artists_by_categories["lyricists"] = artists_by_categories["producers"]
-        return artists_by_categories, is_support
+        return artists_by_categories, is_support, label
+
+    @staticmethod
+    def parse_publish_date(publish_date: str) -> tuple[int, int, int]:
+        """Returns the year, month and day of a publish date."""
+        try:
+            return (
+                int(publish_date[0:4]),
+                int(publish_date[5:7]),
+                int(publish_date[8:10]),
+            )
+        except ValueError:
+            date: datetime = datetime.fromisoformat(publish_date[:-1])
+            return date.year, date.month, date.day
 
     @staticmethod
     def get_genres(info: InfoDict) -> Optional[str]:
-        genres: list[str] = []
-        tag_usage: TagUsageDict
-        for tag_usage in sorted(
-            info.get("tags", {}), reverse=True, key=lambda x: x.get("count")
-        ):
-            tag: TagDict = tag_usage.get("tag")
-            if tag.get("categoryName") == "Genres":
-                genres.append(tag.get("name").title())
-        return "; ".join(genres) if len(genres) > 0 else None
+        genre_tags: list[TagUsageDict] = [
+            tag_usage
+            for tag_usage in info.get("tags", [])
+            if tag_usage["tag"].get("categoryName") == "Genres"
+        ]
+        if not genre_tags:
+            return None
+        genre_tags.sort(reverse=True, key=itemgetter("count"))
+        return "; ".join(tag_usage["tag"]["name"].title() for tag_usage in genre_tags)
 
     @classmethod
     def get_lyrics(
@@ -937,29 +1138,42 @@ class VocaDBPlugin(BeetsPlugin):
         language: Optional[str],
         translated_lyrics: bool = False,
     ) -> tuple[Optional[str], Optional[str], Optional[str]]:
-        out_script: Optional[str] = None
-        out_language: Optional[str] = None
-        out_lyrics: Optional[str] = None
+        lyrics_by_culture: dict[str, list[LyricsDict]] = {}
+        lyrics_by_translation: dict[str, list[LyricsDict]] = {}
         lyric: LyricsDict
         for lyric in lyrics:
+            culture_code: str
+            for culture_code in lyric["cultureCodes"]:
+                lyrics_by_culture.setdefault(culture_code, []).append(lyric)
+            lyrics_by_translation.setdefault(lyric["translationType"], []).append(
+                lyric
+            )
+        out_script: Optional[str] = None
+        out_language: Optional[str] = None
+        # The last original lyrics in English or Japanese decide the script
+        for lyric in reversed(lyrics_by_translation.get("Original", [])):
             if "en" in lyric["cultureCodes"]:
-                if lyric["translationType"] == "Original":
-                    out_script = "Latn"
-                    out_language = "eng"
-                if translated_lyrics or language == "English":
-                    out_lyrics = lyric["value"]
-            elif "ja" in lyric["cultureCodes"]:
-                if lyric["translationType"] == "Original":
-                    out_script = "Jpan"
-                    out_language = "jpn"
-                if not translated_lyrics and language == "Japanese":
-                    out_lyrics = lyric["value"]
-            if (
-                not translated_lyrics
-                and language == "Romaji"
-                and lyric["translationType"] == "Romanized"
-            ):
-                out_lyrics = lyric["value"]
+                out_script = "Latn"
+                out_language = "eng"
+                break
+            if "ja" in lyric["cultureCodes"]:
+                out_script = "Jpan"
+                out_language = "jpn"
+                break
+        matching_lyrics: list[LyricsDict] = []
+        if translated_lyrics or language == "English":
+            matching_lyrics = lyrics_by_culture.get("en", [])
+        elif language == "Japanese":
+            matching_lyrics = [
+                lyric
+                for lyric in lyrics_by_culture.get("ja", [])
+                if "en" not in lyric["cultureCodes"]
+            ]
+        elif language == "Romaji":
+            matching_lyrics = lyrics_by_translation.get("Romanized", [])
+        out_lyrics: Optional[str] = (
+            matching_lyrics[-1]["value"] if matching_lyrics else None
+        )
         if not out_lyrics and lyrics:
             out_lyrics = cls.get_fallback_lyrics(lyrics, language)
         return out_script, out_language, out_lyrics
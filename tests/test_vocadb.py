@@ -1,6 +1,20 @@
+from os.path import join
+from sqlite3 import DatabaseError
+from tempfile import TemporaryDirectory
 from unittest import TestCase
+from unittest.mock import Mock, patch
 
-from beetsplug.vocadb import InfoDict, LyricsDict, VocaDBPlugin
+from beets.library import Item, Library
+from requests import Timeout
+
+from beetsplug.vocadb import (
+    AlbumArtistDict,
+    AlbumDict,
+    InfoDict,
+    LyricsDict,
+    ResponseCache,
+    VocaDBPlugin,
+)
 
 
 class TestVocaDBPlugin(TestCase):
@@ -11,6 +25,106 @@ class TestVocaDBPlugin(TestCase):
         super().__init_subclass__()
         cls.plugin = plugin
 
+    def test_session_headers(self) -> None:
+        headers = self.plugin.session.headers
+        self.assertEqual(headers["accept"], "application/json")
+        self.assertIn("gzip", headers["Accept-Encoding"])
+        self.assertEqual(headers["User-Agent"], self.plugin.user_agent)
+
+    def test_response_cache(self) -> None:
+        with TemporaryDirectory() as directory:
+            cache = ResponseCache(join(directory, "cache.db"), 60)
+            self.addCleanup(cache.close)
+            self.assertIsNone(cache.get("url"))
+            cache.set("url", b"content")
+            self.assertEqual(cache.get("url"), b"content")
+            cache.ttl = -1
+            self.assertIsNone(cache.get("url"))
+            cache.close()
+
+    def test_track_for_id_response_cache(self) -> None:
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        cache = ResponseCache(join(directory.name, "cache.db"), 60)
+        self.addCleanup(cache.close)
+        self.addCleanup(self.plugin.get_cached_content.cache_clear)
+        response = Mock(content=b'{"id": 1, "name": "song1"}')
+        with patch.object(self.plugin, "response_cache", cache), patch.object(
+            self.plugin.session, "get", return_value=response
+        ) as get:
+            self.assertEqual(self.plugin.track_for_id("1", "English").title, "song1")
+            self.plugin.get_cached_content.cache_clear()
+            # Served from disk without another request
+            self.assertEqual(self.plugin.track_for_id("1", "English").title, "song1")
+            self.assertEqual(get.call_count, 1)
+            self.plugin.get_cached_content.cache_clear()
+            # Ignoring the cache fetches again, and refreshes the cache
+            response.content = b'{"id": 1, "name": "song2"}'
+            with patch.object(self.plugin, "read_response_cache", False):
+                self.assertEqual(
+                    self.plugin.track_for_id("1", "English").title, "song2"
+                )
+            self.assertEqual(get.call_count, 2)
+            self.plugin.get_cached_content.cache_clear()
+            self.assertEqual(self.plugin.track_for_id("1", "English").title, "song2")
+            self.assertEqual(get.call_count, 2)
+            self.plugin.get_cached_content.cache_clear()
+            # Cache errors fall back to the network
+            with patch.object(cache, "get", side_effect=DatabaseError):
+                self.assertEqual(
+                    self.plugin.track_for_id("1", "English").title, "song2"
+                )
+            self.assertEqual(get.call_count, 3)
+
+    def test_cache_ttl_disabled(self) -> None:
+        self.plugin.config["cache_ttl"] = 0
+        self.addCleanup(self.plugin.config["cache_ttl"].set, 604800)
+        self.assertIsNone(type(self.plugin)().response_cache)
+
+    def test_parse_publish_date(self) -> None:
+        self.assertEqual(
+            self.plugin.parse_publish_date("2020-01-02T00:00:00Z"), (2020, 1, 2)
+        )
+
+    def test_track_for_id_cache(self) -> None:
+        self.addCleanup(self.plugin.get_cached_content.cache_clear)
+        response = Mock(content=b'{"id": 1, "name": "song1"}')
+        with patch.object(self.plugin, "response_cache", None), patch.object(
+            self.plugin.session, "get", return_value=response
+        ) as get:
+            first = self.plugin.track_for_id("1", "English")
+            second = self.plugin.track_for_id("1", "English")
+        self.assertEqual(get.call_count, 1)
+        self.assertIsNot(first, second)
+        self.assertEqual(first, second)
+
+    def test_track_for_id_timeout(self) -> None:
+        with patch.object(self.plugin, "response_cache", None), patch.object(
+            self.plugin.session, "get", side_effect=Timeout
+        ):
+            self.assertIsNone(self.plugin.track_for_id("1", "English"))
+
+    def test_prefetch(self) -> None:
+        lookup = Mock(side_effect=lambda id, language: id + language)
+        ids = ["1", "2", "3", "4", "5"]
+        with patch.object(self.plugin, "batch_size", 2):
+            results = self.plugin.prefetch(lookup, ids, "!")
+            self.assertEqual(next(results), "1!")
+            # Only the first batch has been fetched so far
+            self.assertLessEqual(lookup.call_count, 2)
+            self.assertEqual(list(results), ["2!", "3!", "4!", "5!"])
+
+    def test_singletons_skips_other_sources(self) -> None:
+        lib = Library(":memory:")
+        lib.add(Item(title="a", mb_trackid="1", data_source="OtherDB"))
+        lib.add(Item(title="b", mb_trackid="2", data_source=self.plugin.data_source))
+        with patch.object(self.plugin, "track_for_id", return_value=None) as lookup:
+            # Matching items from other sources are skipped, not looked up
+            self.plugin.singletons(
+                lib, ["title:a", ",", "title:b"], False, True, False, "English"
+            )
+        lookup.assert_called_once_with("2", "English")
+
     def test_get_genres(self) -> None:
         info: InfoDict = {}
         self.assertEqual(self.plugin.get_genres(info), None)
@@ -65,6 +179,86 @@ class TestVocaDBPlugin(TestCase):
         }
         self.assertEqual(self.plugin.get_genres(info), "Genre2")
 
+    def test_album_info_disc_totals(self) -> None:
+        release: AlbumDict = {
+            "discs": [
+                {"discNumber": 1, "mediaType": "Audio", "name": "CD"},
+                {"discNumber": 2, "mediaType": "Audio", "name": "CD"},
+                {"discNumber": 3, "mediaType": "Video", "name": "DVD"},
+            ],
+            "tracks": [
+                {
+                    "discNumber": disc_number,
+                    "trackNumber": track_number,
+                    "song": {"id": disc_number * 10 + track_number},
+                }
+                for disc_number, track_number in [(1, 1), (1, 2), (2, 1), (3, 1)]
+            ],
+        }
+        album_info = self.plugin.album_info(release)
+        self.assertEqual(
+            [(track.medium, track.medium_total) for track in album_info.tracks],
+            [(1, 2), (1, 2), (2, 1)],
+        )
+        self.assertEqual(album_info.mediums, 3)
+
+    def test_get_artists_by_categories(self) -> None:
+        artists: list[AlbumArtistDict] = [
+            {
+                "artist": {"id": 1, "name": "producer1"},
+                "categories": "Producer",
+                "effectiveRoles": "Default",
+                "isSupport": False,
+            },
+            {
+                "artist": {"id": 2, "name": "producer2"},
+                "categories": "Producer",
+                "effectiveRoles": "Composer, Lyricist",
+                "isSupport": False,
+            },
+            {
+                "artist": {"id": 3, "name": "vocalist1"},
+                "categories": "Vocalist",
+                "effectiveRoles": "Default",
+                "isSupport": True,
+            },
+            {
+                "categories": "Circle",
+                "effectiveRoles": "Arranger",
+                "isSupport": False,
+                "name": "circle1",
+            },
+            {
+                "artist": {"id": 4, "name": "label1"},
+                "categories": "Label",
+                "effectiveRoles": "Default",
+                "isSupport": False,
+                "name": "label1 (credited)",
+            },
+        ]
+        artists_by_categories, is_support, label = (
+            self.plugin.get_artists_by_categories(artists)
+        )
+        self.assertEqual(
+            artists_by_categories["producers"], {"producer1": "1", "producer2": "2"}
+        )
+        self.assertEqual(artists_by_categories["circles"], {"circle1": ""})
+        self.assertEqual(artists_by_categories["vocalists"], {"vocalist1": "3"})
+        self.assertEqual(
+            artists_by_categories["arrangers"], {"producer1": "1", "circle1": ""}
+        )
+        self.assertEqual(
+            artists_by_categories["composers"], {"producer1": "1", "producer2": "2"}
+        )
+        self.assertEqual(
+            artists_by_categories["lyricists"], {"producer1": "1", "producer2": "2"}
+        )
+        self.assertEqual(
+            is_support, {"1": False, "2": False, "3": True, "": False, "4": False}
+        )
+        self.assertEqual(label, "label1 (credited)")
+        self.assertEqual(artists[0]["effectiveRoles"], "Default")
+
     def test_language(self) -> None:
         self.plugin.languages = ["en", "jp"]
         self.plugin.config["prefer_romaji"] = False
@@ -78,6 +272,22 @@ class TestVocaDBPlugin(TestCase):
         self.plugin.languages = []
         self.assertEqual(self.plugin.language, "English")
 
+    def test_item_candidates_lyrics_language(self) -> None:
+        response = Mock(
+            content=b"""{"items": [{"id": 1, "name": "song1", "lyrics": [
+                {"cultureCodes": ["ja"], "translationType": "Original",
+                 "value": "ja lyrics"},
+                {"cultureCodes": ["en"], "translationType": "Translation",
+                 "value": "en lyrics"}
+            ]}]}"""
+        )
+        with patch.object(self.plugin, "languages", ["en"]), patch.object(
+            self.plugin.session, "get", return_value=response
+        ):
+            candidates = self.plugin.item_candidates(Item(), "", "song1")
+        # Lyrics are picked in the search language, not the first ones listed
+        self.assertEqual([candidate.lyrics for candidate in candidates], ["en lyrics"])
+
     def test_get_lyrics(self) -> None:
         lyrics: list[LyricsDict] = [
             {